@@ -1,6 +1,7 @@
 # coding=utf-8
 import threading
 
+import machinetalk.protobuf.types_pb2 as pb
 from machinetalk.protobuf.message_pb2 import Container
 from .constants import (
     ENGAGE_BRAKE,
@@ -21,6 +22,27 @@ from ..machinetalk_core.application.commandbase import CommandBase
 
 
 class ApplicationCommand(ComponentBase, CommandBase, ServiceContainer):
+    # serialized messages of the commands without parameters,
+    # the ticket is appended on send
+    _command_type_data = {
+        msg_type: Container(type=msg_type).SerializeToString()
+        for msg_type in (
+            pb.MT_EMC_COOLANT_FLOOD_ON,
+            pb.MT_EMC_COOLANT_FLOOD_OFF,
+            pb.MT_EMC_COOLANT_MIST_ON,
+            pb.MT_EMC_COOLANT_MIST_OFF,
+            pb.MT_EMC_TOOL_LOAD_TOOL_TABLE,
+            pb.MT_EMC_AXIS_OVERRIDE_LIMITS,
+            pb.MT_EMC_SPINDLE_BRAKE_ENGAGE,
+            pb.MT_EMC_SPINDLE_BRAKE_RELEASE,
+            pb.MT_EMC_SPINDLE_OFF,
+            pb.MT_EMC_SPINDLE_INCREASE,
+            pb.MT_EMC_SPINDLE_DECREASE,
+            pb.MT_EMC_SPINDLE_CONSTANT,
+            pb.MT_SHUTDOWN,
+        )
+    }
+
     def __init__(self, debug=False):
         CommandBase.__init__(self, debuglevel=int(debug))
         ComponentBase.__init__(self)
@@ -41,8 +63,13 @@ class ApplicationCommand(ComponentBase, CommandBase, ServiceContainer):
         self._executed_updated = False
         self._completed_updated = False
 
-        # more efficient to reuse a protobuf message
-        self._tx = Container()
+        # reusable messages for commands with parameters, one per message type
+        self._command_txs = {}
+        # only holds the ticket, appended to the cached command type data
+        self._ticket_tx = Container()
+        # serialized type and interpreter of the program control commands,
+        # filled on first use of a combination
+        self._command_interp_data = {}
 
         self._command_service = Service(type_='command')
         self.add_service(self._command_service)
@@ -120,416 +147,174 @@ class ApplicationCommand(ComponentBase, CommandBase, ServiceContainer):
         for cb in self.on_connected_changed:
             cb(connected)
 
-    def _take_ticket(self):
+    def _get_command_tx(self, msg_type):
+        # the parameter sub-message stays attached to the reused message,
+        # commands only overwrite the fields they use
+        tx = self._command_txs.get(msg_type)
+        if tx is None:
+            tx = Container()
+            tx.type = msg_type
+            tx.emc_command_params.SetInParent()
+            self._command_txs[msg_type] = tx
+        return tx
+
+    def _send_command_tx(self, msg_type, tx):
         self.ticket += 1
-        self._tx.ticket = self.ticket
+        tx.ticket = self.ticket
+        try:
+            data = tx.SerializeToString()
+        finally:
+            tx.emc_command_params.Clear()
+        self.send_command_data(msg_type, data)
         return self.ticket
 
-    def abort(self, interpreter='execute'):
-        if not self.connected:
-            return None
+    def _send_command_prefix(self, msg_type, prefix):
+        # the cached prefixes only hold type (1) and interp_name (26), fields
+        # below the ticket (55); appending the ticket results in the same
+        # bytes as serializing the complete message, a prefix extended by a
+        # field above 55 (e.g. emc_command_params) breaks this ordering
+        self.ticket += 1
+        self._ticket_tx.ticket = self.ticket
+        data = prefix + self._ticket_tx.SerializePartialToString()
+        self.send_command_data(msg_type, data)
+        return self.ticket
 
-        self._tx.interp_name = interpreter
+    def _send_command_type(self, msg_type):
+        return self._send_command_prefix(msg_type, self._command_type_data[msg_type])
 
-        ticket = self._take_ticket()
-        self.send_emc_task_abort(self._tx)
-        return ticket
+    def _send_command_interp(self, msg_type, interpreter):
+        key = (msg_type, interpreter)
+        prefix = self._command_interp_data.get(key)
+        if prefix is None:
+            prefix = Container(type=msg_type, interp_name=interpreter)
+            prefix = prefix.SerializeToString()
+            self._command_interp_data[key] = prefix
+        return self._send_command_prefix(msg_type, prefix)
 
-    def run_program(self, line_number, interpreter='execute'):
+    def abort(self, interpreter='execute'):
         if not self.connected:
             return None
 
-        params = self._tx.emc_command_params
-        params.line_number = line_number
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_run(self._tx)
-        return ticket
+        return self._send_command_interp(pb.MT_EMC_TASK_ABORT, interpreter)
 
     def pause_program(self, interpreter='execute'):
         if not self.connected:
             return None
 
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_pause(self._tx)
-        return ticket
+        return self._send_command_interp(pb.MT_EMC_TASK_PLAN_PAUSE, interpreter)
 
     def step_program(self, interpreter='execute'):
         if not self.connected:
             return None
 
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_step(self._tx)
-        return ticket
+        return self._send_command_interp(pb.MT_EMC_TASK_PLAN_STEP, interpreter)
 
     def resume_program(self, interpreter='execute'):
         if not self.connected:
             return None
 
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_resume(self._tx)
-        return ticket
-
-    def set_task_mode(self, mode, interpreter='execute'):
-        if not self.connected:
-            return
-
-        params = self._tx.emc_command_params
-        params.task_mode = mode
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_set_mode(self._tx)
-        return ticket
-
-    def set_task_state(self, state, interpreter='execute'):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.task_state = state
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_set_state(self._tx)
-        return ticket
-
-    def open_program(self, file_name, interpreter='execute'):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.path = file_name
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_open(self._tx)
-        return ticket
+        return self._send_command_interp(pb.MT_EMC_TASK_PLAN_RESUME, interpreter)
 
     def reset_program(self, interpreter='execute'):
         if not self.connected:
             return None
 
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_init(self._tx)
-        return ticket
-
-    def execute_mdi(self, command, interpreter='execute'):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.command = command
-        self._tx.interp_name = interpreter
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_execute(self._tx)
-        return ticket
+        return self._send_command_interp(pb.MT_EMC_TASK_PLAN_INIT, interpreter)
 
     def set_spindle_brake(self, brake):
         if not self.connected:
             return None
 
-        ticket = self._take_ticket()
         if brake == ENGAGE_BRAKE:
-            self.send_emc_spindle_brake_engage(self._tx)
+            return self._send_command_type(pb.MT_EMC_SPINDLE_BRAKE_ENGAGE)
         elif brake == RELEASE_BRAKE:
-            self.send_emc_spindle_brake_release(self._tx)
-        return ticket
-
-    def set_debug_level(self, debug_level):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.debug_level = debug_level
-        self._tx.interp_name = debug_level
-
-        ticket = self._take_ticket()
-        self.send_emc_set_debug(self._tx)
-        return ticket
-
-    def set_feed_override(self, scale):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.scale = scale
-
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_scale(self._tx)
-        return ticket
+            return self._send_command_type(pb.MT_EMC_SPINDLE_BRAKE_RELEASE)
+        return None
 
     def set_flood_enabled(self, enable):
         if not self.connected:
             return None
 
-        ticket = self._take_ticket()
         if enable:
-            self.send_emc_coolant_flood_on(self._tx)
+            return self._send_command_type(pb.MT_EMC_COOLANT_FLOOD_ON)
         else:
-            self.send_emc_coolant_flood_off(self._tx)
-        return ticket
-
-    def home_axis(self, index):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.index = index
-
-        ticket = self._take_ticket()
-        self.send_emc_axis_home(self._tx)
-        return ticket
+            return self._send_command_type(pb.MT_EMC_COOLANT_FLOOD_OFF)
 
     def jog(self, jog_type, axis, velocity=0.0, distance=0.0):
         if not self.connected:
             return None
 
-        params = self._tx.emc_command_params
-        params.index = axis
-
         if jog_type == JOG_STOP:
-            ticket = self._take_ticket()
-            self.send_emc_axis_abort(self._tx)
+            msg_type = pb.MT_EMC_AXIS_ABORT
+            tx = self._get_command_tx(msg_type)
         elif jog_type == JOG_CONTINUOUS:
-            params.velocity = velocity
-            ticket = self._take_ticket()
-            self.send_emc_axis_jog(self._tx)
+            msg_type = pb.MT_EMC_AXIS_JOG
+            tx = self._get_command_tx(msg_type)
+            tx.emc_command_params.velocity = velocity
         elif jog_type == JOG_INCREMENT:
+            msg_type = pb.MT_EMC_AXIS_INCR_JOG
+            tx = self._get_command_tx(msg_type)
+            params = tx.emc_command_params
             params.velocity = velocity
             params.distance = distance
-            ticket = self._take_ticket()
-            self.send_emc_axis_incr_jog(self._tx)
         else:
-            self._tx.Clear()
             return None
+        tx.emc_command_params.index = axis
 
-        return ticket
+        return self._send_command_tx(msg_type, tx)
 
     def load_tool_table(self):
         if not self.connected:
             return None
 
-        ticket = self._take_ticket()
-        self.send_emc_tool_load_tool_table(self._tx)
-        return ticket
+        return self._send_command_type(pb.MT_EMC_TOOL_LOAD_TOOL_TABLE)
 
     def update_tool_table(self, tool_table):
         pass  # TODO
 
-    def set_maximum_velocity(self, velocity):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.velocity = velocity
-
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_max_velocity(self._tx)
-        return ticket
-
     def set_mist_enabled(self, enable):
         if not self.connected:
             return None
 
-        ticket = self._take_ticket()
         if enable:
-            self.send_emc_coolant_mist_on(self._tx)
+            return self._send_command_type(pb.MT_EMC_COOLANT_MIST_ON)
         else:
-            self.send_emc_coolant_mist_off(self._tx)
-        return ticket
+            return self._send_command_type(pb.MT_EMC_COOLANT_MIST_OFF)
 
     def override_limits(self):
         if not self.connected:
             return None
 
-        ticket = self._take_ticket()
-        self.send_emc_axis_override_limits(self._tx)
-        return ticket
-
-    def set_adaptive_feed_enabled(self, enable):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.enable = enable
-
-        ticket = self._take_ticket()
-        self.send_emc_motion_adaptive(self._tx)
-        return ticket
-
-    def set_analog_output(self, index, value):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.index = index
-        params.value = value
-
-        ticket = self._take_ticket()
-        self.send_emc_motion_set_aout(self._tx)
-        return ticket
-
-    def set_block_delete_enabled(self, enable):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.enable = enable
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_set_block_delete(self._tx)
-        return ticket
-
-    def set_digital_output(self, index, enable):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.index = index
-        params.enable = enable
-
-        ticket = self._take_ticket()
-        self.send_emc_motion_set_dout(self._tx)
-        return ticket
-
-    def set_feed_hold_enabled(self, enable):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.enable = enable
-
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_fh_enable(self._tx)
-        return ticket
-
-    def set_feed_override_enabled(self, enable):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.enable = enable
-
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_fo_enable(self._tx)
-        return ticket
-
-    def set_axis_max_position_limit(self, axis, value):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.index = axis
-        params.value = value
-
-        ticket = self._take_ticket()
-        self.send_emc_axis_set_max_position_limit(self._tx)
-        return ticket
-
-    def set_axis_min_position_limit(self, axis, value):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.index = axis
-        params.value = value
-
-        ticket = self._take_ticket()
-        self.send_emc_axis_set_min_position_limit(self._tx)
-        return ticket
-
-    def set_optional_stop_enabled(self, enable):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.enable = enable
-
-        ticket = self._take_ticket()
-        self.send_emc_task_plan_set_optional_stop(self._tx)
-        return ticket
-
-    def set_spindle_override_enabled(self, enable):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.enable = enable
-
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_so_enable(self._tx)
-        return ticket
+        return self._send_command_type(pb.MT_EMC_AXIS_OVERRIDE_LIMITS)
 
     def set_spindle(self, mode, velocity=0.0):
         if not self.connected:
             return None
 
-        params = self._tx.emc_command_params
         if mode == SPINDLE_FORWARD:
-            params.velocity = velocity
-            ticket = self._take_ticket()
-            self.send_emc_spindle_on(self._tx)
+            tx = self._get_command_tx(pb.MT_EMC_SPINDLE_ON)
+            tx.emc_command_params.velocity = velocity
+            return self._send_command_tx(pb.MT_EMC_SPINDLE_ON, tx)
         elif mode == SPINDLE_REVERSE:
-            params.velocity = velocity * -1.0
-            ticket = self._take_ticket()
-            self.send_emc_spindle_on(self._tx)
+            tx = self._get_command_tx(pb.MT_EMC_SPINDLE_ON)
+            tx.emc_command_params.velocity = velocity * -1.0
+            return self._send_command_tx(pb.MT_EMC_SPINDLE_ON, tx)
         elif mode == SPINDLE_OFF:
-            ticket = self._take_ticket()
-            self.send_emc_spindle_off(self._tx)
+            return self._send_command_type(pb.MT_EMC_SPINDLE_OFF)
         elif mode == SPINDLE_INCREASE:
-            ticket = self._take_ticket()
-            self.send_emc_spindle_increase(self._tx)
+            return self._send_command_type(pb.MT_EMC_SPINDLE_INCREASE)
         elif mode == SPINDLE_DECREASE:
-            ticket = self._take_ticket()
-            self.send_emc_spindle_decrease(self._tx)
+            return self._send_command_type(pb.MT_EMC_SPINDLE_DECREASE)
         elif mode == SPINDLE_CONSTANT:
-            ticket = self._take_ticket()
-            self.send_emc_spindle_constant(self._tx)
-        else:
-            self._tx.Clear()
-            return None
-
-        return ticket
-
-    def set_spindle_override(self, scale):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.scale = scale
-
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_spindle_scale(self._tx)
-        return ticket
-
-    def set_teleop_enabled(self, enable):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.enable = enable
-
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_teleop_enable(self._tx)
-        return ticket
+            return self._send_command_type(pb.MT_EMC_SPINDLE_CONSTANT)
+        return None
 
     def set_teleop_vector(self, a, b, c, u, v, w):
         if not self.connected:
             return None
 
-        params = self._tx.emc_command_params
-        pose = params.pose
+        tx = self._get_command_tx(pb.MT_EMC_TRAJ_SET_TELEOP_VECTOR)
+        pose = tx.emc_command_params.pose
         pose.a = a
         pose.b = b
         pose.c = c
@@ -537,9 +322,7 @@ class ApplicationCommand(ComponentBase, CommandBase, ServiceContainer):
         pose.v = v
         pose.w = w
 
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_teleop_vector(self._tx)
-        return ticket
+        return self._send_command_tx(pb.MT_EMC_TRAJ_SET_TELEOP_VECTOR, tx)
 
     def set_tool_offset(
         self, index, zoffset, xoffset, diameter, frontangle, backangle, orientation
@@ -547,8 +330,8 @@ class ApplicationCommand(ComponentBase, CommandBase, ServiceContainer):
         if not self.connected:
             return None
 
-        params = self._tx.emc_command_params
-        tooldata = params.tool_data
+        tx = self._get_command_tx(pb.MT_EMC_TOOL_SET_OFFSET)
+        tooldata = tx.emc_command_params.tool_data
         tooldata.index = index
         tooldata.zoffset = zoffset
         tooldata.xoffset = xoffset
@@ -557,36 +340,136 @@ class ApplicationCommand(ComponentBase, CommandBase, ServiceContainer):
         tooldata.backangle = backangle
         tooldata.orientation = orientation
 
-        ticket = self._take_ticket()
-        self.send_emc_tool_set_offset(self._tx)
-        return ticket
-
-    def set_trajectory_mode(self, mode):
-        if not self.connected:
-            return None
-
-        params = self._tx.emc_command_params
-        params.traj_mode = mode
-
-        ticket = self._take_ticket()
-        self.send_emc_traj_set_mode(self._tx)
-        return ticket
+        return self._send_command_tx(pb.MT_EMC_TOOL_SET_OFFSET, tx)
 
-    def unhome_axis(self, index):
+    def shutdown(self):
         if not self.connected:
             return None
 
-        params = self._tx.emc_command_params
-        params.index = index
-
-        ticket = self._take_ticket()
-        self.send_emc_axis_unhome(self._tx)
-        return ticket
+        return self._send_command_type(pb.MT_SHUTDOWN)
+
+
+# commands which only set emc_command_params fields
+# name, message type, (argument, parameter field) pairs, has interpreter argument
+_PARAMETER_COMMANDS = (
+    ('run_program', pb.MT_EMC_TASK_PLAN_RUN, (('line_number', 'line_number'),), True),
+    ('set_task_mode', pb.MT_EMC_TASK_SET_MODE, (('mode', 'task_mode'),), True),
+    ('set_task_state', pb.MT_EMC_TASK_SET_STATE, (('state', 'task_state'),), True),
+    ('open_program', pb.MT_EMC_TASK_PLAN_OPEN, (('file_name', 'path'),), True),
+    ('execute_mdi', pb.MT_EMC_TASK_PLAN_EXECUTE, (('command', 'command'),), True),
+    ('set_debug_level', pb.MT_EMC_SET_DEBUG, (('debug_level', 'debug_level'),), False),
+    ('set_feed_override', pb.MT_EMC_TRAJ_SET_SCALE, (('scale', 'scale'),), False),
+    ('home_axis', pb.MT_EMC_AXIS_HOME, (('index', 'index'),), False),
+    (
+        'set_maximum_velocity',
+        pb.MT_EMC_TRAJ_SET_MAX_VELOCITY,
+        (('velocity', 'velocity'),),
+        False,
+    ),
+    (
+        'set_adaptive_feed_enabled',
+        pb.MT_EMC_MOTION_ADAPTIVE,
+        (('enable', 'enable'),),
+        False,
+    ),
+    (
+        'set_analog_output',
+        pb.MT_EMC_MOTION_SET_AOUT,
+        (('index', 'index'), ('value', 'value')),
+        False,
+    ),
+    (
+        'set_block_delete_enabled',
+        pb.MT_EMC_TASK_PLAN_SET_BLOCK_DELETE,
+        (('enable', 'enable'),),
+        False,
+    ),
+    (
+        'set_digital_output',
+        pb.MT_EMC_MOTION_SET_DOUT,
+        (('index', 'index'), ('enable', 'enable')),
+        False,
+    ),
+    (
+        'set_feed_hold_enabled',
+        pb.MT_EMC_TRAJ_SET_FH_ENABLE,
+        (('enable', 'enable'),),
+        False,
+    ),
+    (
+        'set_feed_override_enabled',
+        pb.MT_EMC_TRAJ_SET_FO_ENABLE,
+        (('enable', 'enable'),),
+        False,
+    ),
+    (
+        'set_axis_max_position_limit',
+        pb.MT_EMC_AXIS_SET_MAX_POSITION_LIMIT,
+        (('axis', 'index'), ('value', 'value')),
+        False,
+    ),
+    (
+        'set_axis_min_position_limit',
+        pb.MT_EMC_AXIS_SET_MIN_POSITION_LIMIT,
+        (('axis', 'index'), ('value', 'value')),
+        False,
+    ),
+    (
+        'set_optional_stop_enabled',
+        pb.MT_EMC_TASK_PLAN_SET_OPTIONAL_STOP,
+        (('enable', 'enable'),),
+        False,
+    ),
+    (
+        'set_spindle_override_enabled',
+        pb.MT_EMC_TRAJ_SET_SO_ENABLE,
+        (('enable', 'enable'),),
+        False,
+    ),
+    (
+        'set_spindle_override',
+        pb.MT_EMC_TRAJ_SET_SPINDLE_SCALE,
+        (('scale', 'scale'),),
+        False,
+    ),
+    (
+        'set_teleop_enabled',
+        pb.MT_EMC_TRAJ_SET_TELEOP_ENABLE,
+        (('enable', 'enable'),),
+        False,
+    ),
+    ('set_trajectory_mode', pb.MT_EMC_TRAJ_SET_MODE, (('mode', 'traj_mode'),), False),
+    ('unhome_axis', pb.MT_EMC_AXIS_UNHOME, (('index', 'index'),), False),
+)
 
-    def shutdown(self):
-        if not self.connected:
-            return None
 
-        ticket = self._take_ticket()
-        self.send_shutdown(self._tx)
-        return ticket
+def _make_parameter_command(name, msg_type, fields, interpreter):
+    # generated from source to keep the argument names and to have the
+    # message type as constant instead of a closure variable
+    args = [arg for arg, _ in fields]
+    if interpreter:
+        args.append("interpreter='execute'")
+    lines = [
+        'def %s(self, %s):' % (name, ', '.join(args)),
+        '    if not self.connected:',
+        '        return None',
+        '    tx = self._get_command_tx(%d)' % msg_type,
+        '    params = tx.emc_command_params',
+    ]
+    for arg, field in fields:
+        lines.append('    params.%s = %s' % (field, arg))
+    if interpreter:
+        lines.append('    tx.interp_name = interpreter')
+    lines.append('    return self._send_command_tx(%d, tx)' % msg_type)
+
+    namespace = {}
+    exec('\n'.join(lines), namespace)
+    command = namespace[name]
+    command.__module__ = __name__
+    command.__qualname__ = 'ApplicationCommand.%s' % name
+    return command
+
+
+for _command in _PARAMETER_COMMANDS:
+    setattr(ApplicationCommand, _command[0], _make_parameter_command(*_command))
+del _command
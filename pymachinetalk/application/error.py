@@ -1,5 +1,6 @@
 # coding=utf-8
 import threading
+from collections import deque
 
 from ..common import ComponentBase
 from ..dns_sd import ServiceContainer, Service
@@ -7,20 +8,26 @@ from ..machinetalk_core.application.errorbase import ErrorBase
 
 
 class ApplicationError(ComponentBase, ErrorBase, ServiceContainer):
-    def __init__(self, debug=False):
+    # keeps at most max_messages received messages, messages beyond the limit
+    # are dropped oldest first when get_messages is not called in time
+    def __init__(self, debug=False, max_messages=1024):
         ErrorBase.__init__(self, debuglevel=int(debug))
         ComponentBase.__init__(self)
         ServiceContainer.__init__(self)
-        self.message_lock = threading.Lock()
         self.connected_condition = threading.Condition(threading.Lock())
         self.debug = debug
 
         # callbacks
         self.on_connected_changed = []
 
+        # deprecated, the message buffer does not require a lock anymore
+        self.message_lock = threading.Lock()
+
         self.connected = False
-        self.channels = {'error', 'text', 'display'}
-        self.error_list = []
+        self.channels = frozenset((b'error', b'text', b'display'))
+        # bounded deque, no longer a list; oldest messages are dropped when
+        # they are not fetched in time
+        self.error_list = deque(maxlen=max_messages)
 
         self._error_service = Service(type_='error')
         self.add_service(self._error_service)
@@ -56,11 +63,9 @@ class ApplicationError(ComponentBase, ErrorBase, ServiceContainer):
         self._error_message_received(rx)
 
     def _error_message_received(self, rx):
-        error = {'type': rx.type, 'notes': []}
-        with self.message_lock:
-            for note in rx.note:
-                error['notes'].append(note)
-                self.error_list.append(error)
+        # the socket thread is the only producer, deque appends and pops are
+        # atomic so neither side requires a lock
+        self.error_list.append({'type': rx.type, 'notes': list(rx.note)})
 
     # slot
     def update_topics(self):
@@ -85,7 +90,13 @@ class ApplicationError(ComponentBase, ErrorBase, ServiceContainer):
 
     # returns all received messages and clears the buffer
     def get_messages(self):
-        with self.message_lock:
-            messages = list(self.error_list)  # make sure to return a copy
-            self.error_list = []
-            return messages
+        # only pops the messages present when called, messages appended in
+        # the meantime stay for the next call
+        error_list = self.error_list
+        messages = []
+        for _ in range(len(error_list)):
+            try:
+                messages.append(error_list.popleft())
+            except IndexError:
+                break  # drained by a concurrent call
+        return messages
@@ -59,7 +59,8 @@ class ApplicationLog(ComponentBase, LogBase, ServiceContainer):
     # slot
     def log_message_received(self, identity, rx):
         log_message = rx.log_message
-        print('received {}'.format(log_message))
+        if self.debug:
+            print('[log] received %s' % log_message)
         if log_message.level > self.log_level:
             return
 
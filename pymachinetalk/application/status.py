@@ -1,7 +1,8 @@
 # coding=utf-8
 import threading
-import six
+import warnings
 
+from google.protobuf.internal import api_implementation
 from machinetalk.protobuf.message_pb2 import Container
 from machinetalk.protobuf.status_pb2 import (
     EMC_TASK_MODE_AUTO,
@@ -14,6 +15,14 @@ from ..machinetalk_core.application.statusbase import StatusBase
 
 
 class ApplicationStatus(ComponentBase, StatusBase, ServiceContainer):
+    # (task_mode, interp_state) combinations considered as running
+    _running_states = frozenset(
+        (
+            (EMC_TASK_MODE_AUTO, EMC_TASK_INTERP_IDLE),
+            (EMC_TASK_MODE_MDI, EMC_TASK_INTERP_IDLE),
+        )
+    )
+
     def __init__(self, debug=False):
         StatusBase.__init__(self, debuglevel=int(debug))
         ComponentBase.__init__(self)
@@ -26,6 +35,14 @@ class ApplicationStatus(ComponentBase, StatusBase, ServiceContainer):
         self.synced_condition = threading.Condition(threading.Lock())
         self.debug = debug
 
+        # status streams are parsed per message, the pure-Python backend is slow
+        if api_implementation.Type() == 'python':
+            warnings.warn(
+                'protobuf uses the pure-Python implementation, set '
+                'PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=cpp to speed up status parsing',
+                RuntimeWarning,
+            )
+
         # callbacks
         self.on_synced_changed = []
 
@@ -39,14 +56,28 @@ class ApplicationStatus(ComponentBase, StatusBase, ServiceContainer):
         self._interp_data = None
         # required for object initialization
         self._container = Container()
-        self._initialize_object('io')
-        self._initialize_object('config')
-        self._initialize_object('motion')
-        self._initialize_object('task')
-        self._initialize_object('interp')
+        # topic -> (container field, update function)
+        self._topic_dispatch = {
+            b'motion': ('emc_status_motion', self._update_motion_object),
+            b'config': ('emc_status_config', self._update_config_object),
+            b'io': ('emc_status_io', self._update_io_object),
+            b'task': ('emc_status_task', self._update_task_object),
+            b'interp': ('emc_status_interp', self._update_interp_object),
+        }
+        for channel in self._topic_dispatch:
+            self._initialize_object(channel)
 
-        self._synced_channels = set()
-        self.channels = {'motion', 'config', 'task', 'io', 'interp'}
+        self.channels = frozenset((b'motion', b'config', b'task', b'io', b'interp'))
+        # sync state is tracked as bit mask of the topics with a full update
+        self._channel_bits = {
+            b'motion': 1,
+            b'config': 2,
+            b'io': 4,
+            b'task': 8,
+            b'interp': 16,
+        }
+        self._channels_mask = self._get_channels_mask()
+        self._synced_mask = 0
 
         self._status_service = Service(type_='status')
         self.add_service(self._status_service)
@@ -56,32 +87,29 @@ class ApplicationStatus(ComponentBase, StatusBase, ServiceContainer):
         self.status_uri = self._status_service.uri
         self.ready = ready
 
-    # make sure locks are used when accessing properties
+    # the reference to a data object is only swapped when it is re-initialized,
+    # updates are merged into the object in place under the channel condition;
+    # a reader holding the reference may see a partially merged object
     # should we return a copy instead of the reference?
     @property
     def io(self):
-        with self.io_condition:
-            return self._io_data
+        return self._io_data
 
     @property
     def config(self):
-        with self.config_condition:
-            return self._config_data
+        return self._config_data
 
     @property
     def motion(self):
-        with self.motion_condition:
-            return self._motion_data
+        return self._motion_data
 
     @property
     def task(self):
-        with self.task_condition:
-            return self._task_data
+        return self._task_data
 
     @property
     def interp(self):
-        with self.interp_condition:
-            return self._interp_data
+        return self._interp_data
 
     def wait_synced(self, timeout=None):
         with self.synced_condition:
@@ -118,30 +146,31 @@ class ApplicationStatus(ComponentBase, StatusBase, ServiceContainer):
         self._emcstat_update_received(topic, rx)
 
     def _emcstat_update_received(self, topic, rx):
-        topic = six.ensure_str(topic)
-        if topic == 'motion' and rx.HasField('emc_status_motion'):
-            self._update_motion_object(rx.emc_status_motion)
-        elif topic == 'config' and rx.HasField('emc_status_config'):
-            self._update_config_object(rx.emc_status_config)
-        elif topic == 'io' and rx.HasField('emc_status_io'):
-            self._update_io_object(rx.emc_status_io)
-        elif topic == 'task' and rx.HasField('emc_status_task'):
-            self._update_task_object(rx.emc_status_task)
-        elif topic == 'interp' and rx.HasField('emc_status_interp'):
-            self._update_interp_object(rx.emc_status_interp)
+        entry = self._topic_dispatch.get(topic)
+        if entry is None:
+            return
+        field, update = entry
+        if rx.HasField(field):
+            update(getattr(rx, field))
 
     def _update_synced_channels(self, channel):
-        self._synced_channels.add(channel)
-        if (self._synced_channels == self.channels) and not self.synced:
+        self._synced_mask |= self._channel_bits.get(channel, 0)
+        if self._synced_mask == self._channels_mask and not self.synced:
             self.channels_synced()
 
+    def _get_channels_mask(self):
+        mask = 0
+        for channel in self.channels:
+            mask |= self._channel_bits.get(channel, 0)
+        return mask
+
     # slot
     def sync_status(self):
         self._update_synced(True)
 
     # slot
     def unsync_status(self):
-        self._synced_channels.clear()
+        self._synced_mask = 0
         self._update_synced(False)
 
     def _update_synced(self, synced):
@@ -153,35 +182,26 @@ class ApplicationStatus(ComponentBase, StatusBase, ServiceContainer):
 
     # slot
     def update_topics(self):
+        # channels may be assigned as str, the topics and lookups use bytes
+        self.channels = frozenset(
+            channel.encode() if isinstance(channel, str) else channel
+            for channel in self.channels
+        )
         self.clear_status_topics()
+        self._channels_mask = self._get_channels_mask()
         for channel in self.channels:
             self.add_status_topic(channel)
             self._initialize_object(channel)
 
     def _initialize_object(self, channel):
-        if channel == 'io':
-            self._io_data = MessageObject()
-            recurse_descriptor(self._container.emc_status_io.DESCRIPTOR, self._io_data)
-        elif channel == 'config':
-            self._config_data = MessageObject()
-            recurse_descriptor(
-                self._container.emc_status_config.DESCRIPTOR, self._config_data
-            )
-        elif channel == 'motion':
-            self._motion_data = MessageObject()
-            recurse_descriptor(
-                self._container.emc_status_motion.DESCRIPTOR, self._motion_data
-            )
-        elif channel == 'task':
-            self._task_data = MessageObject()
-            recurse_descriptor(
-                self._container.emc_status_task.DESCRIPTOR, self._task_data
-            )
-        elif channel == 'interp':
-            self._interp_data = MessageObject()
-            recurse_descriptor(
-                self._container.emc_status_interp.DESCRIPTOR, self._interp_data
-            )
+        entry = self._topic_dispatch.get(channel)
+        if entry is None:
+            return  # unknown channels are subscribed but not tracked
+        # build the object completely before publishing it
+        field, _ = entry
+        data = MessageObject()
+        recurse_descriptor(getattr(self._container, field).DESCRIPTOR, data)
+        setattr(self, '_%s_data' % channel.decode(), data)
 
     def _update_motion_object(self, data):
         with self.motion_condition:
@@ -211,9 +231,5 @@ class ApplicationStatus(ComponentBase, StatusBase, ServiceContainer):
             self.interp_condition.notify()
 
     def _update_running(self):
-        running = (
-            self._task_data.task_mode == EMC_TASK_MODE_AUTO
-            or self._task_data.task_mode == EMC_TASK_MODE_MDI
-        ) and self._interp_data.interp_state == EMC_TASK_INTERP_IDLE
-
-        self.running = running
+        state = (self._task_data.task_mode, self._interp_data.interp_state)
+        self.running = state in self._running_states
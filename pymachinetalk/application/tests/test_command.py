@@ -0,0 +1,119 @@
+# coding=utf-8
+import pytest
+
+import machinetalk.protobuf.types_pb2 as pb
+from machinetalk.protobuf.message_pb2 import Container
+
+
+@pytest.fixture
+def command(mocker):
+    from pymachinetalk import application
+
+    command = application.ApplicationCommand()
+    command.connected = True
+    mocker.patch.object(command, 'send_command_data')
+    return command
+
+
+def sent_messages(command):
+    messages = []
+    for (msg_type, data), _ in command.send_command_data.call_args_list:
+        rx = Container()
+        rx.ParseFromString(data)
+        assert rx.type == msg_type
+        messages.append(rx)
+    return messages
+
+
+def test_command_with_parameters_is_sent_with_ticket(command):
+    ticket = command.set_feed_override(0.5)
+
+    (rx,) = sent_messages(command)
+    assert rx.type == pb.MT_EMC_TRAJ_SET_SCALE
+    assert rx.ticket == ticket
+    assert rx.emc_command_params.scale == 0.5
+
+
+def test_parameters_do_not_leak_into_next_command(command):
+    command.jog(1, 2, velocity=3.0)  # JOG_CONTINUOUS
+    command.jog(0, 1)  # JOG_STOP
+
+    first, second = sent_messages(command)
+    assert first.emc_command_params.velocity == 3.0
+    assert second.type == pb.MT_EMC_AXIS_ABORT
+    assert second.emc_command_params.index == 1
+    assert not second.emc_command_params.HasField('velocity')
+
+
+def test_reusing_a_command_sends_the_new_values(command):
+    command.execute_mdi('G0 X1', interpreter='preview')
+    command.execute_mdi('G0 X2')
+
+    first, second = sent_messages(command)
+    assert second.ticket == first.ticket + 1
+    assert second.emc_command_params.command == 'G0 X2'
+    assert second.interp_name == 'execute'
+
+
+def test_command_is_not_sent_when_disconnected(command):
+    command.connected = False
+
+    assert command.set_feed_override(0.5) is None
+    assert not command.send_command_data.called
+
+
+def test_command_without_parameters_is_serialized_like_a_message(command):
+    ticket = command.set_flood_enabled(True)
+    command.shutdown()
+
+    (msg_type, data), _ = command.send_command_data.call_args_list[0]
+    expected = Container(type=pb.MT_EMC_COOLANT_FLOOD_ON, ticket=ticket)
+    assert data == expected.SerializeToString()
+    assert sent_messages(command)[1].ticket == ticket + 1
+
+
+def test_generated_commands_keep_their_signature():
+    import inspect
+    from pymachinetalk.application import ApplicationCommand
+
+    signature = inspect.signature(ApplicationCommand.set_axis_max_position_limit)
+    assert list(signature.parameters) == ['self', 'axis', 'value']
+    signature = inspect.signature(ApplicationCommand.open_program)
+    assert signature.parameters['interpreter'].default == 'execute'
+
+
+def test_generated_command_maps_arguments_to_parameters(command):
+    command.set_axis_min_position_limit(axis=2, value=-10.0)
+
+    (rx,) = sent_messages(command)
+    assert rx.type == pb.MT_EMC_AXIS_SET_MIN_POSITION_LIMIT
+    assert rx.emc_command_params.index == 2
+    assert rx.emc_command_params.value == -10.0
+
+
+def test_generated_command_can_be_overridden_by_subclass(mocker):
+    from pymachinetalk.application import ApplicationCommand
+
+    class MyCommand(ApplicationCommand):
+        def set_feed_override(self, scale):
+            return super(MyCommand, self).set_feed_override(scale / 2.0)
+
+    command = MyCommand()
+    mocker.patch.object(command, 'send_command_data')
+    command._update_connected(True)
+    command.set_feed_override(1.0)
+
+    (rx,) = sent_messages(command)
+    assert rx.emc_command_params.scale == 0.5
+
+
+def test_program_command_is_serialized_like_a_message(command):
+    ticket = command.pause_program(interpreter='preview')
+    command.pause_program()
+
+    (msg_type, data), _ = command.send_command_data.call_args_list[0]
+    expected = Container(
+        type=pb.MT_EMC_TASK_PLAN_PAUSE, interp_name='preview', ticket=ticket
+    )
+    assert data == expected.SerializeToString()
+    assert sent_messages(command)[1].interp_name == 'execute'
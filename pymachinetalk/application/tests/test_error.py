@@ -0,0 +1,44 @@
+# coding=utf-8
+import pytest
+
+import machinetalk.protobuf.types_pb2 as pb
+from machinetalk.protobuf.message_pb2 import Container
+
+
+@pytest.fixture
+def error():
+    from pymachinetalk import application
+
+    return application.ApplicationError()
+
+
+def test_error_message_is_stored_once_with_all_notes(error):
+    rx = Container(type=pb.MT_EMC_OPERATOR_ERROR)
+    rx.note.extend(['first', 'second'])
+
+    error.emc_operator_error_received(b'error', rx)
+
+    assert error.get_messages() == [
+        {'type': pb.MT_EMC_OPERATOR_ERROR, 'notes': ['first', 'second']}
+    ]
+
+
+def test_get_messages_clears_the_buffer(error):
+    rx = Container(type=pb.MT_EMC_NML_TEXT)
+    rx.note.append('text')
+    error.emc_nml_text_received(b'text', rx)
+
+    assert len(error.get_messages()) == 1
+    assert error.get_messages() == []
+
+
+def test_oldest_messages_are_dropped_when_buffer_is_full():
+    from pymachinetalk import application
+
+    error = application.ApplicationError(max_messages=2)
+    for text in ('first', 'second', 'third'):
+        rx = Container(type=pb.MT_EMC_NML_DISPLAY)
+        rx.note.append(text)
+        error.emc_nml_display_received(b'display', rx)
+
+    assert [m['notes'] for m in error.get_messages()] == [['second'], ['third']]
@@ -0,0 +1,124 @@
+# coding=utf-8
+import pytest
+
+
+@pytest.fixture
+def status():
+    from pymachinetalk import application
+
+    return application.ApplicationStatus()
+
+
+@pytest.fixture
+def rx():
+    from machinetalk.protobuf.message_pb2 import Container
+
+    return Container()
+
+
+def test_update_for_topic_updates_matching_object(status, rx):
+    rx.emc_status_motion.feedrate = 0.5
+
+    status.emcstat_incremental_update_received(b'motion', rx)
+
+    assert status.motion.feedrate == 0.5
+
+
+def test_update_for_unknown_topic_is_ignored(status, rx):
+    rx.emc_status_motion.feedrate = 0.5
+
+    status.emcstat_incremental_update_received(b'foo', rx)
+
+    assert status.motion.feedrate == 0.0
+
+
+def test_update_without_matching_field_is_ignored(status, rx):
+    rx.emc_status_config.max_velocity = 2.0
+
+    status.emcstat_incremental_update_received(b'motion', rx)
+
+    assert status.config.max_velocity == 0.0
+
+
+def test_full_update_of_all_channels_syncs_status(status, rx, mocker):
+    channels_synced = mocker.patch.object(status, 'channels_synced')
+
+    for topic in (b'motion', b'config', b'io', b'task'):
+        status.emcstat_full_update_received(topic, rx)
+    assert not channels_synced.called
+    status.emcstat_full_update_received(b'interp', rx)
+
+    assert channels_synced.called
+
+
+def test_unsync_status_requires_full_updates_again(status, rx, mocker):
+    channels_synced = mocker.patch.object(status, 'channels_synced')
+    for topic in (b'motion', b'config', b'io', b'task', b'interp'):
+        status.emcstat_full_update_received(topic, rx)
+
+    status.unsync_status()
+    channels_synced.reset_mock()
+    status.emcstat_full_update_received(b'motion', rx)
+
+    assert not channels_synced.called
+
+
+def test_running_depends_on_task_mode_and_interp_state(status, rx):
+    from machinetalk.protobuf.status_pb2 import (
+        EMC_TASK_MODE_MANUAL,
+        EMC_TASK_MODE_MDI,
+        EMC_TASK_INTERP_IDLE,
+        EMC_TASK_INTERP_READING,
+    )
+
+    rx.emc_status_task.task_mode = EMC_TASK_MODE_MDI
+    rx.emc_status_interp.interp_state = EMC_TASK_INTERP_IDLE
+    status.emcstat_full_update_received(b'task', rx)
+    status.emcstat_full_update_received(b'interp', rx)
+    assert status.running
+
+    rx.emc_status_interp.interp_state = EMC_TASK_INTERP_READING
+    status.emcstat_incremental_update_received(b'interp', rx)
+    assert not status.running
+
+    rx.emc_status_task.task_mode = EMC_TASK_MODE_MANUAL
+    rx.emc_status_interp.interp_state = EMC_TASK_INTERP_IDLE
+    status.emcstat_incremental_update_received(b'task', rx)
+    status.emcstat_incremental_update_received(b'interp', rx)
+    assert not status.running
+
+
+def test_topics_are_subscribed_as_bytes(status):
+    status.channels = frozenset((b'motion', b'task'))
+    status.update_topics()
+    status.add_status_topic('io')
+
+    assert status._status_channel._socket_topics == {b'motion', b'task', b'io'}
+
+
+def test_update_topics_resets_the_status_objects(status, rx):
+    rx.emc_status_motion.feedrate = 0.5
+    status.emcstat_full_update_received(b'motion', rx)
+
+    status.update_topics()
+
+    assert status.motion.feedrate == 0.0
+
+
+def test_update_topics_accepts_str_channels(status):
+    status.channels = {'motion', 'task'}
+
+    status.update_topics()
+
+    assert status._status_channel._socket_topics == {b'motion', b'task'}
+    assert status.motion is not None
+    assert status.task is not None
+
+
+def test_update_topics_subscribes_unknown_channels(status):
+    status.channels = frozenset((b'motion', b'foo'))
+
+    status.update_topics()
+
+    assert status._status_channel._socket_topics == {b'motion', b'foo'}
+    assert status._channels_mask == status._channel_bits[b'motion']
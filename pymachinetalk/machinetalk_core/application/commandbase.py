@@ -151,16 +151,18 @@ class CommandBase(object):
     # process all messages received on command
     def _command_channel_message_received(self, rx):
 
+        rx_type = rx.type
+
         # react to emccmd executed message
-        if rx.type == pb.MT_EMCCMD_EXECUTED:
+        if rx_type == pb.MT_EMCCMD_EXECUTED:
             self.emccmd_executed_received(rx)
 
         # react to emccmd completed message
-        elif rx.type == pb.MT_EMCCMD_COMPLETED:
+        elif rx_type == pb.MT_EMCCMD_COMPLETED:
             self.emccmd_completed_received(rx)
 
         # react to error message
-        elif rx.type == pb.MT_ERROR:
+        elif rx_type == pb.MT_ERROR:
             # update error string with note
             self.error_string = ''
             for note in rx.note:
@@ -178,6 +180,9 @@ class CommandBase(object):
     def send_command_message(self, msg_type, tx):
         self._command_channel.send_socket_message(msg_type, tx)
 
+    def send_command_data(self, msg_type, data):
+        self._command_channel.send_socket_data(msg_type, data)
+
     def send_emc_task_abort(self, tx):
         self.send_command_message(pb.MT_EMC_TASK_ABORT, tx)
 
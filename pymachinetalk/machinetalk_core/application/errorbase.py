@@ -160,28 +160,30 @@ class ErrorBase(object):
     # process all messages received on error
     def _error_channel_message_received(self, identity, rx):
 
+        rx_type = rx.type
+
         # react to emc nml error message
-        if rx.type == pb.MT_EMC_NML_ERROR:
+        if rx_type == pb.MT_EMC_NML_ERROR:
             self.emc_nml_error_received(identity, rx)
 
         # react to emc nml text message
-        elif rx.type == pb.MT_EMC_NML_TEXT:
+        elif rx_type == pb.MT_EMC_NML_TEXT:
             self.emc_nml_text_received(identity, rx)
 
         # react to emc nml display message
-        elif rx.type == pb.MT_EMC_NML_DISPLAY:
+        elif rx_type == pb.MT_EMC_NML_DISPLAY:
             self.emc_nml_display_received(identity, rx)
 
         # react to emc operator text message
-        elif rx.type == pb.MT_EMC_OPERATOR_TEXT:
+        elif rx_type == pb.MT_EMC_OPERATOR_TEXT:
             self.emc_operator_text_received(identity, rx)
 
         # react to emc operator error message
-        elif rx.type == pb.MT_EMC_OPERATOR_ERROR:
+        elif rx_type == pb.MT_EMC_OPERATOR_ERROR:
             self.emc_operator_error_received(identity, rx)
 
         # react to emc operator display message
-        elif rx.type == pb.MT_EMC_OPERATOR_DISPLAY:
+        elif rx_type == pb.MT_EMC_OPERATOR_DISPLAY:
             self.emc_operator_display_received(identity, rx)
 
         for cb in self.on_error_message_received:
@@ -1,6 +1,7 @@
 # coding=utf-8
 import zmq
 import threading
+import time
 import uuid
 from google.protobuf.message import DecodeError
 from fysom import Fysom
@@ -8,6 +9,8 @@ from fysom import Fysom
 import machinetalk.protobuf.types_pb2 as pb
 from machinetalk.protobuf.message_pb2 import Container
 
+from ..common.scheduler import HeartbeatScheduler
+
 
 class ErrorSubscribe(object):
     def __init__(self, debuglevel=0, debugname='Error Subscribe'):
@@ -15,12 +18,12 @@ class ErrorSubscribe(object):
         self.debugname = debugname
         self._error_string = ''
         self.on_error_string_changed = []
-        # ZeroMQ
-        context = zmq.Context()
-        context.linger = 0
+        # ZeroMQ, the context is shared by all channels of the process
+        context = zmq.Context.instance()
         self._context = context
         # pipe to signalize a shutdown
         self._shutdown = context.socket(zmq.PUSH)
+        self._shutdown.setsockopt(zmq.LINGER, 0)
         self._shutdown_uri = b'inproc://shutdown-%s' % str(uuid.uuid4()).encode()
         self._shutdown.bind(self._shutdown_uri)
         self._thread = None  # socket worker tread
@@ -32,10 +35,11 @@ class ErrorSubscribe(object):
         # more efficient to reuse protobuf messages
         self._socket_rx = Container()
 
-        # Heartbeat
+        # Heartbeat, timed by the process wide heartbeat scheduler
         self._heartbeat_lock = threading.Lock()
-        self._heartbeat_interval = 2500
-        self._heartbeat_timer = None
+        self._heartbeat_period = 2.5  # interval in seconds, None if disabled
+        self._heartbeat_deadline = None  # monotonic time of the next tick
+        self._heartbeat_scheduled = None  # deadline of the scheduler entry
         self._heartbeat_active = False
         self._heartbeat_liveness = 0
         self._heartbeat_reset_liveness = 5
@@ -155,9 +159,14 @@ class ErrorSubscribe(object):
             self._fsm.stop()
 
     def add_socket_topic(self, name):
+        # topics are stored encoded, zmq subscribes with bytes
+        if not isinstance(name, bytes):
+            name = name.encode()
         self._socket_topics.add(name)
 
     def remove_socket_topic(self, name):
+        if not isinstance(name, bytes):
+            name = name.encode()
         self._socket_topics.remove(name)
 
     def clear_socket_topics(self):
@@ -167,11 +176,19 @@ class ErrorSubscribe(object):
         poll = zmq.Poller()
         socket = context.socket(zmq.SUB)
         socket.setsockopt(zmq.LINGER, 0)
+        # the kernel detects dead peers, also while no messages are received
+        socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_IDLE, 30)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_INTVL, 10)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_CNT, 3)
+        # subscribe before connecting, the subscriptions are sent with the
+        # connection handshake
+        # one subscription per topic is required, the publisher answers each
+        # topic subscription with a full update, do not use an empty prefix
+        for topic in self._socket_topics:
+            socket.setsockopt(zmq.SUBSCRIBE, topic)
         socket.connect(uri)
         poll.register(socket, zmq.POLLIN)
-        # subscribe is always connected to socket creation
-        for topic in self._socket_topics:
-            socket.setsockopt(zmq.SUBSCRIBE, topic.encode())
 
         shutdown = context.socket(zmq.PULL)
         shutdown.connect(self._shutdown_uri)
@@ -183,22 +200,52 @@ class ErrorSubscribe(object):
                 shutdown.recv()
                 return  # shutdown signal
             if socket in s:
-                self._socket_message_received(socket)
+                # drain pending messages to avoid a poll per message, the
+                # batch is limited and a shutdown stops it before the next
+                # message is parsed
+                for _ in range(100):
+                    if shutdown.poll(0):
+                        shutdown.recv()
+                        return  # shutdown signal
+                    try:
+                        frames = socket.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self._socket_message_received(frames)
 
     def start_socket(self):
         self._thread = threading.Thread(
             target=self._socket_worker, args=(self._context, self.socket_uri)
         )
+        self._thread.daemon = True  # a missing stop must not block the exit
         self._thread.start()
 
     def stop_socket(self):
         self._shutdown.send(b' ')  # trigger socket thread shutdown
         self._thread = None
 
-    def _heartbeat_timer_tick(self):
+    def _heartbeat_timer_expired(self, scheduled):
         with self._heartbeat_lock:
-            self._heartbeat_timer = None  # timer is dead on tick
+            if scheduled != self._heartbeat_scheduled:
+                return  # superseded by an earlier entry or timer stopped
+            self._heartbeat_scheduled = None
+            deadline = self._heartbeat_deadline
+            if not self._heartbeat_active or deadline is None:
+                return
+            if deadline > time.monotonic():
+                self._schedule_heartbeat(deadline)  # timer was reset meanwhile
+                return
+            self._heartbeat_deadline = None  # timer is dead on tick
+        self._heartbeat_timer_tick()
+
+    def _schedule_heartbeat(self, deadline):
+        # heartbeat lock must be held
+        self._heartbeat_scheduled = deadline
+        HeartbeatScheduler.instance().schedule(
+            deadline, lambda: self._heartbeat_timer_expired(deadline)
+        )
 
+    def _heartbeat_timer_tick(self):
         if self.debuglevel > 0:
             print('[%s] heartbeat timer tick' % self.debugname)
 
@@ -218,38 +265,35 @@ class ErrorSubscribe(object):
         if not self._heartbeat_active:
             return
 
-        self._heartbeat_lock.acquire()
-        if self._heartbeat_timer:
-            self._heartbeat_timer.cancel()
-            self._heartbeat_timer = None
-
-        if self._heartbeat_interval > 0:
-            self._heartbeat_timer = threading.Timer(
-                self._heartbeat_interval / 1000.0, self._heartbeat_timer_tick
-            )
-            self._heartbeat_timer.start()
-        self._heartbeat_lock.release()
+        with self._heartbeat_lock:
+            period = self._heartbeat_period
+            deadline = None if period is None else time.monotonic() + period
+            self._heartbeat_deadline = deadline
+            # a postponed deadline is picked up when the scheduled entry
+            # expires, only an earlier deadline requires a new entry
+            scheduled = self._heartbeat_scheduled
+            if deadline is not None and (scheduled is None or deadline < scheduled):
+                self._schedule_heartbeat(deadline)
         if self.debuglevel > 0:
             print('[%s] heartbeat timer reset' % self.debugname)
 
     def start_heartbeat_timer(self):
-        self._heartbeat_active = True
+        with self._heartbeat_lock:
+            self._heartbeat_active = True
         self.reset_heartbeat_timer()
 
     def stop_heartbeat_timer(self):
-        self._heartbeat_active = False
-        self._heartbeat_lock.acquire()
-        if self._heartbeat_timer:
-            self._heartbeat_timer.cancel()
-            self._heartbeat_timer = None
-        self._heartbeat_lock.release()
+        with self._heartbeat_lock:
+            self._heartbeat_active = False
+            self._heartbeat_deadline = None
+            self._heartbeat_scheduled = None
 
     # process all messages received on socket
-    def _socket_message_received(self, socket):
-        (identity, msg) = socket.recv_multipart()  # identity is topic
+    def _socket_message_received(self, frames):
+        identity = frames[0]  # identity is topic
 
         try:
-            self._socket_rx.ParseFromString(msg)
+            self._socket_rx.ParseFromString(frames[1])
         except DecodeError as e:
             note = 'Protobuf Decode Error: ' + str(e)
             print(note)  # TODO: decode error
@@ -262,14 +306,18 @@ class ErrorSubscribe(object):
         rx = self._socket_rx
 
         # react to any incoming message
+        # up to up is a self transition, calling the handler directly skips
+        # the fsm event dispatch on every received message
         if self._fsm.isstate('up'):
-            self._fsm.any_msg_received()
+            self._on_fsm_any_msg_received(None)
+
+        rx_type = rx.type
 
         # react to ping message
-        if rx.type == pb.MT_PING:
+        if rx_type == pb.MT_PING:
             if rx.HasField('pparams'):
                 interval = rx.pparams.keepalive_timer
-                self._heartbeat_interval = interval
+                self._heartbeat_period = interval / 1000.0 if interval > 0 else None
             if self._fsm.isstate('trying'):
                 self._fsm.ping_received()
             return  # ping is uninteresting
@@ -153,8 +153,10 @@ class LogBase(object):
     # process all messages received on log
     def _log_channel_message_received(self, identity, rx):
 
+        rx_type = rx.type
+
         # react to log message message
-        if rx.type == pb.MT_LOG_MESSAGE:
+        if rx_type == pb.MT_LOG_MESSAGE:
             self.log_message_received(identity, rx)
 
         for cb in self.on_log_message_received:
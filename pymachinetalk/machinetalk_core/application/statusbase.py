@@ -181,12 +181,14 @@ class StatusBase(object):
     # process all messages received on status
     def _status_channel_message_received(self, identity, rx):
 
+        rx_type = rx.type
+
         # react to emcstat full update message
-        if rx.type == pb.MT_EMCSTAT_FULL_UPDATE:
+        if rx_type == pb.MT_EMCSTAT_FULL_UPDATE:
             self.emcstat_full_update_received(identity, rx)
 
         # react to emcstat incremental update message
-        elif rx.type == pb.MT_EMCSTAT_INCREMENTAL_UPDATE:
+        elif rx_type == pb.MT_EMCSTAT_INCREMENTAL_UPDATE:
             self.emcstat_incremental_update_received(identity, rx)
 
         for cb in self.on_status_message_received:
@@ -1,6 +1,7 @@
 # coding=utf-8
 import zmq
 import threading
+import time
 import uuid
 from google.protobuf.message import DecodeError
 from fysom import Fysom
@@ -8,6 +9,8 @@ from fysom import Fysom
 import machinetalk.protobuf.types_pb2 as pb
 from machinetalk.protobuf.message_pb2 import Container
 
+from ..common.scheduler import HeartbeatScheduler
+
 
 class RpcClient(object):
     def __init__(self, debuglevel=0, debugname='RPC Client'):
@@ -15,16 +18,17 @@ class RpcClient(object):
         self.debugname = debugname
         self._error_string = ''
         self.on_error_string_changed = []
-        # ZeroMQ
-        context = zmq.Context()
-        context.linger = 0
+        # ZeroMQ, the context is shared by all channels of the process
+        context = zmq.Context.instance()
         self._context = context
         # pipe to signalize a shutdown
         self._shutdown = context.socket(zmq.PUSH)
+        self._shutdown.setsockopt(zmq.LINGER, 0)
         self._shutdown_uri = b'inproc://shutdown-%s' % str(uuid.uuid4()).encode()
         self._shutdown.bind(self._shutdown_uri)
         # pipe for outgoing messages
         self._pipe = context.socket(zmq.PUSH)
+        self._pipe.setsockopt(zmq.LINGER, 0)
         self._pipe_uri = b'inproc://pipe-%s' % str(uuid.uuid4()).encode()
         self._pipe.bind(self._pipe_uri)
         self._thread = None  # socket worker tread
@@ -34,12 +38,14 @@ class RpcClient(object):
         self.socket_uri = ''
         # more efficient to reuse protobuf messages
         self._socket_rx = Container()
-        self._socket_tx = Container()
+        # ping messages never change, serialize only once
+        self._ping_data = Container(type=pb.MT_PING).SerializeToString()
 
-        # Heartbeat
+        # Heartbeat, timed by the process wide heartbeat scheduler
         self._heartbeat_lock = threading.Lock()
-        self._heartbeat_interval = 2500
-        self._heartbeat_timer = None
+        self._heartbeat_period = 2.5  # interval in seconds, None if disabled
+        self._heartbeat_deadline = None  # monotonic time of the next tick
+        self._heartbeat_scheduled = None  # deadline of the scheduler entry
         self._heartbeat_active = False
         self._heartbeat_liveness = 0
         self._heartbeat_reset_liveness = 5
@@ -169,6 +175,11 @@ class RpcClient(object):
         poll = zmq.Poller()
         socket = context.socket(zmq.DEALER)
         socket.setsockopt(zmq.LINGER, 0)
+        # the kernel detects dead peers, also while no messages are received
+        socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_IDLE, 30)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_INTVL, 10)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_CNT, 3)
         socket.connect(uri)
         poll.register(socket, zmq.POLLIN)
 
@@ -193,16 +204,35 @@ class RpcClient(object):
         self._thread = threading.Thread(
             target=self._socket_worker, args=(self._context, self.socket_uri)
         )
+        self._thread.daemon = True  # a missing stop must not block the exit
         self._thread.start()
 
     def stop_socket(self):
         self._shutdown.send(b' ')  # trigger socket thread shutdown
         self._thread = None
 
-    def _heartbeat_timer_tick(self):
+    def _heartbeat_timer_expired(self, scheduled):
         with self._heartbeat_lock:
-            self._heartbeat_timer = None  # timer is dead on tick
+            if scheduled != self._heartbeat_scheduled:
+                return  # superseded by an earlier entry or timer stopped
+            self._heartbeat_scheduled = None
+            deadline = self._heartbeat_deadline
+            if not self._heartbeat_active or deadline is None:
+                return
+            if deadline > time.monotonic():
+                self._schedule_heartbeat(deadline)  # timer was reset meanwhile
+                return
+            self._heartbeat_deadline = None  # timer is dead on tick
+        self._heartbeat_timer_tick()
+
+    def _schedule_heartbeat(self, deadline):
+        # heartbeat lock must be held
+        self._heartbeat_scheduled = deadline
+        HeartbeatScheduler.instance().schedule(
+            deadline, lambda: self._heartbeat_timer_expired(deadline)
+        )
 
+    def _heartbeat_timer_tick(self):
         if self.debuglevel > 0:
             print('[%s] heartbeat timer tick' % self.debugname)
 
@@ -226,31 +256,28 @@ class RpcClient(object):
         if not self._heartbeat_active:
             return
 
-        self._heartbeat_lock.acquire()
-        if self._heartbeat_timer:
-            self._heartbeat_timer.cancel()
-            self._heartbeat_timer = None
-
-        if self._heartbeat_interval > 0:
-            self._heartbeat_timer = threading.Timer(
-                self._heartbeat_interval / 1000.0, self._heartbeat_timer_tick
-            )
-            self._heartbeat_timer.start()
-        self._heartbeat_lock.release()
+        with self._heartbeat_lock:
+            period = self._heartbeat_period
+            deadline = None if period is None else time.monotonic() + period
+            self._heartbeat_deadline = deadline
+            # a postponed deadline is picked up when the scheduled entry
+            # expires, only an earlier deadline requires a new entry
+            scheduled = self._heartbeat_scheduled
+            if deadline is not None and (scheduled is None or deadline < scheduled):
+                self._schedule_heartbeat(deadline)
         if self.debuglevel > 0:
             print('[%s] heartbeat timer reset' % self.debugname)
 
     def start_heartbeat_timer(self):
-        self._heartbeat_active = True
+        with self._heartbeat_lock:
+            self._heartbeat_active = True
         self.reset_heartbeat_timer()
 
     def stop_heartbeat_timer(self):
-        self._heartbeat_active = False
-        self._heartbeat_lock.acquire()
-        if self._heartbeat_timer:
-            self._heartbeat_timer.cancel()
-            self._heartbeat_timer = None
-        self._heartbeat_lock.release()
+        with self._heartbeat_lock:
+            self._heartbeat_active = False
+            self._heartbeat_deadline = None
+            self._heartbeat_scheduled = None
 
     # process all messages received on socket
     def _socket_message_received(self, socket):
@@ -273,10 +300,14 @@ class RpcClient(object):
         if self._fsm.isstate('trying'):
             self._fsm.any_msg_received()
         elif self._fsm.isstate('up'):
-            self._fsm.any_msg_received()
+            # self transition, calling the handler directly skips the fsm
+            # event dispatch on every received message
+            self._on_fsm_any_msg_received(None)
+
+        rx_type = rx.type
 
         # react to ping acknowledge message
-        if rx.type == pb.MT_PING_ACKNOWLEDGE:
+        if rx_type == pb.MT_PING_ACKNOWLEDGE:
             return  # ping acknowledge is uninteresting
 
         for cb in self.on_socket_message_received:
@@ -290,14 +321,28 @@ class RpcClient(object):
                 if self.debuglevel > 1:
                     print(str(tx))
 
-            self._pipe.send(tx.SerializeToString())
-            tx.Clear()
+            # always reset the reused message, stale fields must not leak
+            # into the next message even if serialization fails
+            try:
+                self._pipe.send(tx.SerializeToString())
+            finally:
+                tx.Clear()
 
-        if self._fsm.isstate('up'):
-            self._fsm.any_msg_sent()
-        elif self._fsm.isstate('trying'):
-            self._fsm.any_msg_sent()
+        # self transition in both states, skip the fsm event dispatch
+        if self._fsm.isstate('up') or self._fsm.isstate('trying'):
+            self._on_fsm_any_msg_sent(None)
+
+    def send_socket_data(self, msg_type, data):
+        # sends an already serialized message
+        with self._tx_lock:
+            if self.debuglevel > 0:
+                print('[%s] sending message: %s' % (self.debugname, msg_type))
+
+            self._pipe.send(data)
+
+        # self transition in both states, skip the fsm event dispatch
+        if self._fsm.isstate('up') or self._fsm.isstate('trying'):
+            self._on_fsm_any_msg_sent(None)
 
     def send_ping(self):
-        tx = self._socket_tx
-        self.send_socket_message(pb.MT_PING, tx)
+        self.send_socket_data(pb.MT_PING, self._ping_data)
@@ -0,0 +1,67 @@
+# coding=utf-8
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+
+class HeartbeatScheduler(object):
+    # one thread calls the heartbeat timers of all channels in the process
+    # callbacks run on this thread one after another, a blocking callback
+    # delays the heartbeats of all other channels; this includes the state
+    # and user callbacks triggered by a heartbeat timeout, they must not block
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._heap = []  # (deadline, sequence, callback)
+        self._counter = itertools.count()  # orders entries with same deadline
+        self._running = True
+        self._thread = threading.Thread(target=self._worker)
+        self._thread.daemon = True
+        self._thread.start()
+
+    # calls callback from the scheduler thread at the monotonic deadline
+    def schedule(self, deadline, callback):
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._counter), callback))
+            if self._heap[0][0] == deadline:
+                self._condition.notify()  # earlier than the current wait
+
+    # stops the scheduler thread, pending callbacks are dropped
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+
+    def _worker(self):
+        heap = self._heap
+        with self._condition:
+            while self._running:
+                if not heap:
+                    self._condition.wait()
+                    continue
+                remaining = heap[0][0] - time.monotonic()
+                if remaining > 0.0:
+                    self._condition.wait(remaining)
+                    continue
+
+                _, _, callback = heapq.heappop(heap)
+                self._condition.release()
+                try:
+                    callback()
+                except Exception:
+                    traceback.print_exc()
+                finally:
+                    self._condition.acquire()
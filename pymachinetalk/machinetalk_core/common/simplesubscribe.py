@@ -15,12 +15,12 @@ class SimpleSubscribe(object):
         self.debugname = debugname
         self._error_string = ''
         self.on_error_string_changed = []
-        # ZeroMQ
-        context = zmq.Context()
-        context.linger = 0
+        # ZeroMQ, the context is shared by all channels of the process
+        context = zmq.Context.instance()
         self._context = context
         # pipe to signalize a shutdown
         self._shutdown = context.socket(zmq.PUSH)
+        self._shutdown.setsockopt(zmq.LINGER, 0)
         self._shutdown_uri = b'inproc://shutdown-%s' % str(uuid.uuid4()).encode()
         self._shutdown.bind(self._shutdown_uri)
         self._thread = None  # socket worker tread
@@ -106,9 +106,14 @@ class SimpleSubscribe(object):
             self._fsm.stop()
 
     def add_socket_topic(self, name):
+        # topics are stored encoded, zmq subscribes with bytes
+        if not isinstance(name, bytes):
+            name = name.encode()
         self._socket_topics.add(name)
 
     def remove_socket_topic(self, name):
+        if not isinstance(name, bytes):
+            name = name.encode()
         self._socket_topics.remove(name)
 
     def clear_socket_topics(self):
@@ -118,11 +123,19 @@ class SimpleSubscribe(object):
         poll = zmq.Poller()
         socket = context.socket(zmq.SUB)
         socket.setsockopt(zmq.LINGER, 0)
+        # the kernel detects dead peers, also while no messages are received
+        socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_IDLE, 30)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_INTVL, 10)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_CNT, 3)
+        # subscribe before connecting, the subscriptions are sent with the
+        # connection handshake
+        # one subscription per topic is required, the publisher answers each
+        # topic subscription with a full update, do not use an empty prefix
+        for topic in self._socket_topics:
+            socket.setsockopt(zmq.SUBSCRIBE, topic)
         socket.connect(uri)
         poll.register(socket, zmq.POLLIN)
-        # subscribe is always connected to socket creation
-        for topic in self._socket_topics:
-            socket.setsockopt(zmq.SUBSCRIBE, topic.encode())
 
         shutdown = context.socket(zmq.PULL)
         shutdown.connect(self._shutdown_uri)
@@ -134,12 +147,24 @@ class SimpleSubscribe(object):
                 shutdown.recv()
                 return  # shutdown signal
             if socket in s:
-                self._socket_message_received(socket)
+                # drain pending messages to avoid a poll per message, the
+                # batch is limited and a shutdown stops it before the next
+                # message is parsed
+                for _ in range(100):
+                    if shutdown.poll(0):
+                        shutdown.recv()
+                        return  # shutdown signal
+                    try:
+                        frames = socket.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self._socket_message_received(frames)
 
     def start_socket(self):
         self._thread = threading.Thread(
             target=self._socket_worker, args=(self._context, self.socket_uri)
         )
+        self._thread.daemon = True  # a missing stop must not block the exit
         self._thread.start()
 
     def stop_socket(self):
@@ -147,11 +172,11 @@ class SimpleSubscribe(object):
         self._thread = None
 
     # process all messages received on socket
-    def _socket_message_received(self, socket):
-        (identity, msg) = socket.recv_multipart()  # identity is topic
+    def _socket_message_received(self, frames):
+        identity = frames[0]  # identity is topic
 
         try:
-            self._socket_rx.ParseFromString(msg)
+            self._socket_rx.ParseFromString(frames[1])
         except DecodeError as e:
             note = 'Protobuf Decode Error: ' + str(e)
             print(note)  # TODO: decode error
@@ -164,8 +189,10 @@ class SimpleSubscribe(object):
         rx = self._socket_rx
 
         # react to any incoming message
+        # up to up is a self transition, calling the handler directly skips
+        # the fsm event dispatch on every received message
         if self._fsm.isstate('up'):
-            self._fsm.any_msg_received()
+            self._on_fsm_any_msg_received(None)
 
         for cb in self.on_socket_message_received:
             cb(identity, rx)
@@ -356,13 +356,15 @@ class RemoteComponentBase(object):
     # process all messages received on halrcmd
     def _halrcmd_channel_message_received(self, rx):
 
+        rx_type = rx.type
+
         # react to halrcomp bind confirm message
-        if rx.type == pb.MT_HALRCOMP_BIND_CONFIRM:
+        if rx_type == pb.MT_HALRCOMP_BIND_CONFIRM:
             if self._fsm.isstate('binding'):
                 self._fsm.bind_confirmed()
 
         # react to halrcomp bind reject message
-        elif rx.type == pb.MT_HALRCOMP_BIND_REJECT:
+        elif rx_type == pb.MT_HALRCOMP_BIND_REJECT:
             # update error string with note
             self.error_string = ''
             for note in rx.note:
@@ -371,7 +373,7 @@ class RemoteComponentBase(object):
                 self._fsm.bind_rejected()
 
         # react to halrcomp set reject message
-        elif rx.type == pb.MT_HALRCOMP_SET_REJECT:
+        elif rx_type == pb.MT_HALRCOMP_SET_REJECT:
             # update error string with note
             self.error_string = ''
             for note in rx.note:
@@ -385,16 +387,18 @@ class RemoteComponentBase(object):
     # process all messages received on halrcomp
     def _halrcomp_channel_message_received(self, identity, rx):
 
+        rx_type = rx.type
+
         # react to halrcomp full update message
-        if rx.type == pb.MT_HALRCOMP_FULL_UPDATE:
+        if rx_type == pb.MT_HALRCOMP_FULL_UPDATE:
             self.halrcomp_full_update_received(identity, rx)
 
         # react to halrcomp incremental update message
-        elif rx.type == pb.MT_HALRCOMP_INCREMENTAL_UPDATE:
+        elif rx_type == pb.MT_HALRCOMP_INCREMENTAL_UPDATE:
             self.halrcomp_incremental_update_received(identity, rx)
 
         # react to halrcomp error message
-        elif rx.type == pb.MT_HALRCOMP_ERROR:
+        elif rx_type == pb.MT_HALRCOMP_ERROR:
             # update error string with note
             self.error_string = ''
             for note in rx.note:
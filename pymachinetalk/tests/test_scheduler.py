@@ -0,0 +1,164 @@
+# coding=utf-8
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def scheduler():
+    from pymachinetalk.machinetalk_core.common.scheduler import HeartbeatScheduler
+
+    scheduler = HeartbeatScheduler()
+    yield scheduler
+    scheduler.stop()
+
+
+def test_callbacks_are_called_in_deadline_order(scheduler):
+    called = []
+    done = threading.Event()
+    now = time.monotonic()
+
+    scheduler.schedule(now + 0.05, lambda: (called.append(2), done.set()))
+    scheduler.schedule(now + 0.01, lambda: called.append(1))
+
+    assert done.wait(timeout=2.0)
+    assert called == [1, 2]
+
+
+def test_failing_callback_does_not_stop_the_scheduler(scheduler):
+    done = threading.Event()
+    now = time.monotonic()
+
+    scheduler.schedule(now, lambda: 1 / 0)
+    scheduler.schedule(now + 0.01, done.set)
+
+    assert done.wait(timeout=2.0)
+
+
+def test_stop_ends_the_scheduler_thread():
+    from pymachinetalk.machinetalk_core.common.scheduler import HeartbeatScheduler
+
+    scheduler = HeartbeatScheduler()
+    scheduler.schedule(time.monotonic() + 60.0, lambda: None)
+
+    scheduler.stop()
+
+    assert not scheduler._thread.is_alive()
+
+
+class FakeScheduler(object):
+    # runs the due entries in deadline order, advancing the clock to each
+    def __init__(self, clock):
+        self.clock = clock
+        self.entries = []
+
+    def schedule(self, deadline, callback):
+        self.entries.append((deadline, callback))
+
+    def run_until(self, now):
+        while True:
+            due = [entry for entry in self.entries if entry[0] <= now]
+            if not due:
+                break
+            entry = min(due, key=lambda e: e[0])
+            self.entries.remove(entry)
+            self.clock.return_value = entry[0]
+            entry[1]()
+        self.clock.return_value = now
+
+
+@pytest.fixture
+def clock(mocker):
+    from pymachinetalk.machinetalk_core.common import scheduler
+
+    # only the clock of the modules under test is replaced
+    clock = mocker.Mock(return_value=0.0)
+    mocker.patch.object(scheduler, 'time', mocker.Mock(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def fake_scheduler(mocker, clock):
+    from pymachinetalk.machinetalk_core.common.scheduler import HeartbeatScheduler
+
+    scheduler = FakeScheduler(clock)
+    mocker.patch.object(HeartbeatScheduler, 'instance', return_value=scheduler)
+    return scheduler
+
+
+@pytest.fixture(
+    params=[
+        'common.rpcclient.RpcClient',
+        'common.subscribe.Subscribe',
+        'application.statussubscribe.StatusSubscribe',
+        'application.errorsubscribe.ErrorSubscribe',
+        'halremote.halrcompsubscribe.HalrcompSubscribe',
+    ]
+)
+def channel(request, mocker, clock, fake_scheduler):
+    import importlib
+
+    module_name, class_name = request.param.rsplit('.', 1)
+    module = importlib.import_module('pymachinetalk.machinetalk_core.' + module_name)
+    mocker.patch.object(module, 'time', mocker.Mock(monotonic=clock))
+    channel = getattr(module, class_name)()
+    channel._heartbeat_period = 1.0
+    # a tick resets the timer like the heartbeat_tick fsm event does
+    mocker.patch.object(
+        channel, '_heartbeat_timer_tick', side_effect=channel.reset_heartbeat_timer
+    )
+    return channel
+
+
+def test_heartbeat_reset_postpones_the_tick(channel, clock, fake_scheduler):
+    channel.start_heartbeat_timer()
+    clock.return_value = 0.5
+    channel.reset_heartbeat_timer()
+    assert len(fake_scheduler.entries) == 1
+
+    fake_scheduler.run_until(1.25)
+    assert not channel._heartbeat_timer_tick.called
+
+    fake_scheduler.run_until(1.5)
+    assert channel._heartbeat_timer_tick.call_count == 1
+
+
+def test_earlier_heartbeat_deadline_supersedes_pending_entry(
+    channel, clock, fake_scheduler
+):
+    channel._heartbeat_period = 2.0
+    channel.start_heartbeat_timer()
+    channel._heartbeat_period = 0.5
+    channel.reset_heartbeat_timer()
+
+    fake_scheduler.run_until(2.25)
+
+    # ticks at 0.5, 1.0, 1.5 and 2.0, the entry for 2.0 of the first
+    # deadline does not tick again
+    assert channel._heartbeat_timer_tick.call_count == 4
+    assert len(fake_scheduler.entries) == 1
+
+
+def test_stopped_heartbeat_does_not_tick(channel, fake_scheduler):
+    channel.start_heartbeat_timer()
+    channel.stop_heartbeat_timer()
+
+    fake_scheduler.run_until(1.0)
+
+    assert not channel._heartbeat_timer_tick.called
+    assert not fake_scheduler.entries
+
+
+def test_restarted_heartbeat_ignores_stale_entry(channel, clock, fake_scheduler):
+    channel.start_heartbeat_timer()
+    channel.stop_heartbeat_timer()
+    clock.return_value = 0.2
+    channel.start_heartbeat_timer()
+
+    fake_scheduler.run_until(1.1)
+    assert not channel._heartbeat_timer_tick.called
+
+    fake_scheduler.run_until(1.2)
+    assert channel._heartbeat_timer_tick.call_count == 1
+    assert len(fake_scheduler.entries) == 1